@@ -0,0 +1,137 @@
+"""
+Shared HTTP and output helpers for the data update scripts.
+
+- one pooled requests session with urllib3 retries/backoff
+- conditional GET keyed on ETag/Last-Modified plus a body hash, with the
+  validators of the last successful run kept in .http_cache/; the state also
+  records a digest of the script code, so parser/output changes force a refetch
+- atomic JSON output (optional orjson, stdlib json otherwise)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # optional: faster (de)serialization, stdlib json otherwise
+    orjson = None
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/122.0.0.0 Safari/537.36"
+    )
+}
+RETRY = 3
+HTTP_CACHE_DIR = Path(__file__).resolve().parents[1] / ".http_cache"
+
+# one pooled session keeps connections alive; urllib3 handles retries with backoff
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+_ADAPTER = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=RETRY, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504), raise_on_status=False),
+)
+SESSION.mount("https://", _ADAPTER)
+SESSION.mount("http://", _ADAPTER)
+
+
+def code_version(script: str | Path) -> str:
+    """Digest of a script's source plus this module; a different value invalidates the saved fetch state."""
+    digest = hashlib.sha256()
+    for path in (Path(script), Path(__file__)):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _fetch_state_path(url: str) -> Path:
+    return HTTP_CACHE_DIR / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json"
+
+
+def load_fetch_state(url: str) -> Dict[str, str]:
+    """Return validators (etag/last_modified/sha256/code_version) saved by the last successful run."""
+    try:
+        return json.loads(_fetch_state_path(url).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_fetch_state(url: str, state: Dict[str, str]) -> None:
+    HTTP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    _fetch_state_path(url).write_text(json.dumps(state), encoding="utf-8")
+
+
+def fetch_if_changed(
+    url: str, timeout: float, version: str, conditional: bool = True
+) -> Optional[Tuple[requests.Response, Dict[str, str]]]:
+    """GET the page and return it with its new fetch state; None if unchanged since the last saved state.
+
+    The saved state only counts when it was written by the same code *version*
+    (see code_version); otherwise the page is fetched and processed again.
+    Transient failures are retried by the session adapter.
+    """
+    state = load_fetch_state(url) if conditional else {}
+    if state.get("code_version") != version:
+        state = {}
+    headers: Dict[str, str] = {}
+    if state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state.get("last_modified"):
+        headers["If-Modified-Since"] = state["last_modified"]
+    resp = SESSION.get(url, headers=headers, timeout=timeout)
+    if resp.status_code == 304:
+        return None
+    resp.raise_for_status()
+    digest = hashlib.sha256(resp.content).hexdigest()
+    if digest == state.get("sha256"):
+        return None
+    new_state = {
+        "etag": resp.headers.get("ETag", ""),
+        "last_modified": resp.headers.get("Last-Modified", ""),
+        "sha256": digest,
+        "code_version": version,
+    }
+    return resp, new_state
+
+
+def dumps_json(payload: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Serialize to indented UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=default, option=orjson.OPT_INDENT_2)
+    return json.dumps(payload, ensure_ascii=False, indent=2, default=default).encode("utf-8")
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """Write to a sibling temp file and rename over the target, so readers never see a partial file.
+
+    The temp name is unique per call, so concurrent writers (threads or runs) never share it;
+    the last rename wins and the temp file is removed if anything fails.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        try:
+            mode = path.stat().st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(tmp, mode)  # mkstemp creates 0600; keep the target's usual permissions
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
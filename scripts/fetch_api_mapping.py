@@ -6,27 +6,34 @@ Fetch PyTorch ↔ MindSpore API mapping table and split into consistent vs diffe
 Output:
 - data/pytorch_ms_api_mapping_consistent.json
 - data/pytorch_ms_api_mapping_diff.json
+
+ETag/Last-Modified of the last successful run are kept in .http_cache/; when the
+page and this script are unchanged the existing outputs are left as-is (delete the
+cache to force).
 """
 
 from __future__ import annotations
 
-import json
 import time
 import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Dict, Tuple, Set
+from typing import List, Dict, Optional, Tuple
+
+import lxml.html
+from lxml import etree
 
-import requests
-from bs4 import BeautifulSoup
+if __package__:
+    from ._http import atomic_write, code_version, dumps_json, fetch_if_changed, save_fetch_state
+else:  # run as a plain script: python scripts/fetch_api_mapping.py
+    from _http import atomic_write, code_version, dumps_json, fetch_if_changed, save_fetch_state
 
 URL = "https://www.mindspore.cn/docs/en/master/note/api_mapping/pytorch_api_mapping.html"
-HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/122.0.0.0 Safari/537.36"
-    )
-}
+TIMEOUT = 20
+# parser/output code changes invalidate the "page unchanged" skip
+CODE_VERSION = code_version(__file__)
+WRITE_WORKERS = 8
 OUTPUT_DIR = Path(__file__).resolve().parents[1] / "data"
 OUTPUT_CONSISTENT = OUTPUT_DIR / "pytorch_ms_api_mapping_consistent.json"
 OUTPUT_DIFF = OUTPUT_DIR / "pytorch_ms_api_mapping_diff.json"
@@ -34,56 +41,119 @@ OUTPUT_SECTIONS_DIR = OUTPUT_DIR / "convert"
 OUTPUT_SECTIONS_CONS = OUTPUT_SECTIONS_DIR / "consistent"
 OUTPUT_SECTIONS_DIFF = OUTPUT_SECTIONS_DIR / "diff"
 
+# XPath queries are compiled once; they run in C over the lxml tree
+_THS = etree.XPath(".//th")
+_ROWS = etree.XPath("(.//tr)[position() > 1]")
+_CELLS = etree.XPath(".//td")
+# fallback hint scan: prose/headings only; code samples are noise and most of the page
+_HINT_TEXTS = etree.XPath(
+    "(//p | //h1 | //h2 | //h3 | //h4 | //th)//text()[normalize-space()][not(ancestor::code or ancestor::pre)]",
+    smart_strings=False,
+)
+
+_VER_KEYWORDS = re.compile(r"pytorch|mindspore|python|torchaudio", re.IGNORECASE)
+_VER_TOKEN = re.compile(r"api|version|torch|mindspore|python|torchaudio|[012]\.", re.IGNORECASE)
 
-def fetch_html(url: str) -> str:
-    """Fetch HTML content."""
-    resp = requests.get(url, headers=HEADERS, timeout=20)
-    resp.raise_for_status()
+
+def fetch_html(url: str, conditional: bool = True) -> Optional[Tuple[str, Dict[str, str]]]:
+    """Fetch HTML content and its new fetch state; None if unchanged since the last saved state."""
+    fetched = fetch_if_changed(url, TIMEOUT, CODE_VERSION, conditional)
+    if fetched is None:
+        return None
+    resp, new_state = fetched
     resp.encoding = resp.apparent_encoding or "utf-8"
-    return resp.text
+    return resp.text, new_state
+
+
+class _StripTable(dict):
+    """str.translate table deleting non-printable chars and link icons, filled lazily per code point."""
+
+    def __missing__(self, cp: int) -> Optional[int]:
+        value = None if cp == 0xF0C1 or not chr(cp).isprintable() else cp
+        self[cp] = value
+        return value
+
+
+_STRIP_TABLE = _StripTable()
 
 
 def clean_text(text: str) -> str:
     """Strip non-printable/strange characters (e.g., link icons)."""
-    return "".join(ch for ch in text if ch.isprintable() and ch not in {"\uf0c1"}).strip()
+    return text.translate(_STRIP_TABLE).strip()
 
 
 def extract_version_hints(texts: List[str]) -> List[str]:
     """Extract version hints (PyTorch/MindSpore/Python/torchaudio) from section headings or visible text."""
-    hints: List[str] = []
-    for raw in texts:
-        text = clean_text(raw)
-        if not text:
-            continue
-        lower = text.lower()
-        if any(k in lower for k in ["pytorch", "mindspore", "python", "torchaudio"]):
-            if any(ver in lower for ver in ["api", "version", "torch", "mindspore", "python", "torchaudio", "0.", "1.", "2."]):
-                hints.append(text)
-    # Deduplicate while preserving order
-    seen: Set[str] = set()
-    uniq: List[str] = []
-    for h in hints:
-        if h not in seen:
-            uniq.append(h)
-            seen.add(h)
-    return uniq[:15]  # keep a few for context
-
-
-def parse_mapping(html: str) -> Tuple[List[Dict[str, str]], List[str]]:
+    # dict.fromkeys deduplicates while preserving order
+    hints = dict.fromkeys(
+        text
+        for raw in texts
+        if (text := clean_text(raw)) and _VER_KEYWORDS.search(text) and _VER_TOKEN.search(text)
+    )
+    return list(hints)[:15]  # keep a few for context
+
+
+@dataclass
+class MappingCols:
+    """Mapping rows stored column-wise; row dicts are only built for JSON output."""
+
+    section: List[str] = field(default_factory=list)
+    header: List[str] = field(default_factory=list)
+    pytorch: List[str] = field(default_factory=list)
+    mindspore: List[str] = field(default_factory=list)
+    description: List[str] = field(default_factory=list)
+    consistent: List[bool] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.pytorch)
+
+    def append(self, section: str, header: str, pytorch: str, mindspore: str, description: str) -> None:
+        self.section.append(section)
+        self.header.append(header)
+        self.pytorch.append(pytorch)
+        self.mindspore.append(mindspore)
+        self.description.append(description)
+        self.consistent.append(description.strip().lower() == "consistent")
+
+    def to_dicts(self, indices: List[int]) -> List[Dict[str, str]]:
+        """Rehydrate the given rows into the on-disk item schema."""
+        return [
+            {
+                "section": self.section[i],
+                "header": self.header[i],
+                "pytorch": self.pytorch[i],
+                "mindspore": self.mindspore[i],
+                "description": self.description[i],
+            }
+            for i in indices
+        ]
+
+
+def node_text(el: etree._Element) -> str:
+    """Concatenate stripped text nodes under an element (same as BeautifulSoup's get_text(strip=True))."""
+    return "".join(t.strip() for t in el.itertext())
+
+
+def parse_mapping(html: str) -> Tuple[MappingCols, List[str]]:
     """Parse mapping rows from the HTML table and collect version hints."""
-    soup = BeautifulSoup(html, "html.parser")
-    rows: List[Dict[str, str]] = []
+    root = lxml.html.document_fromstring(html)
+    rows = MappingCols()
     section_texts: List[str] = []
-    for table in soup.find_all("table"):
-        heading = table.find_previous(["h1", "h2", "h3", "h4"])
-        section = clean_text(heading.get_text(strip=True)) if heading else ""
+    # single pass in document order; each table belongs to the latest heading seen before it
+    section = ""
+    for el in root.iter("h1", "h2", "h3", "h4", "table"):
+        if el.tag != "table":
+            section = clean_text(node_text(el))
+            continue
+        table = el
         if section:
             section_texts.append(section)
         # also record table header text (可能包含 'PyTorch 2.1 APIs' 等)
-        header_text = clean_text(" ".join(th.get_text(strip=True) for th in table.find_all("th")))
+        th_texts = [node_text(th) for th in _THS(table)]
+        header_text = clean_text(" ".join(th_texts))
         if header_text:
             section_texts.append(header_text)
-        headers = [th.get_text(strip=True).lower() for th in table.find_all("th")]
+        headers = [t.lower() for t in th_texts]
         if len(headers) < 3:
             continue
         first_ok = any(
@@ -93,36 +163,28 @@ def parse_mapping(html: str) -> Tuple[List[Dict[str, str]], List[str]]:
         second_ok = "mindspore" in headers[1]
         if not (first_ok and second_ok):
             continue
-        for tr in table.find_all("tr")[1:]:
-            cells = [td.get_text(strip=True) for td in tr.find_all("td")]
+        for tr in _ROWS(table):
+            cells = [node_text(td) for td in _CELLS(tr)]
             if len(cells) < 3:
                 continue
-            rows.append(
-                {
-                    "section": section,
-                    "header": header_text,
-                    "pytorch": cells[0],
-                    "mindspore": cells[1],
-                    "description": cells[2],
-                }
-            )
+            rows.append(section, header_text, cells[0], cells[1], cells[2])
     # collect version hints from sections and visible text
     version_hints = extract_version_hints(section_texts)
     if not version_hints:
-        version_hints = extract_version_hints(list(soup.stripped_strings))
+        version_hints = extract_version_hints(_HINT_TEXTS(root))
     return rows, version_hints
 
 
-def split_rows(rows: List[Dict[str, str]]) -> tuple[List[Dict[str, str]], List[Dict[str, str]]]:
-    """Split rows into consistent vs differing based on description text."""
-    consistent: List[Dict[str, str]] = []
-    diff: List[Dict[str, str]] = []
-    for row in rows:
-        desc = row.get("description", "").strip().lower()
-        if desc == "consistent":
-            consistent.append(row)
+def split_rows(rows: MappingCols, indices: Optional[List[int]] = None) -> Tuple[List[int], List[int]]:
+    """Split row indices into consistent vs differing based on description text."""
+    consistent: List[int] = []
+    diff: List[int] = []
+    mask = rows.consistent
+    for i in range(len(rows)) if indices is None else indices:
+        if mask[i]:
+            consistent.append(i)
         else:
-            diff.append(row)
+            diff.append(i)
     return consistent, diff
 
 
@@ -137,8 +199,7 @@ def dump_with_meta(path: Path, items: List[Dict[str, str]], total: int, diff_cou
         },
         "items": items,
     }
-    with path.open("w", encoding="utf-8") as fh:
-        json.dump(payload, fh, ensure_ascii=False, indent=2)
+    atomic_write(path, dumps_json(payload))
 
 
 def slugify(text: str) -> str:
@@ -150,49 +211,51 @@ def slugify(text: str) -> str:
 
 def main() -> None:
     print(f"[INFO] fetching mapping table from {URL}")
-    html = fetch_html(URL)
+    fetched = fetch_html(URL, conditional=OUTPUT_CONSISTENT.exists() and OUTPUT_DIFF.exists())
+    if fetched is None:
+        print("[INFO] mapping page unchanged since last run, keeping existing outputs")
+        return
+    html, fetch_state = fetched
     rows, version_hints = parse_mapping(html)
     consistent, diff = split_rows(rows)
 
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    OUTPUT_SECTIONS_DIR.mkdir(parents=True, exist_ok=True)
-    OUTPUT_SECTIONS_CONS.mkdir(parents=True, exist_ok=True)
-    OUTPUT_SECTIONS_DIFF.mkdir(parents=True, exist_ok=True)
-    dump_with_meta(OUTPUT_CONSISTENT, consistent, len(rows), len(diff), version_hints)
-    dump_with_meta(OUTPUT_DIFF, diff, len(rows), len(diff), version_hints)
+    # (path, items, total, diff_count, hints) for every output file; written concurrently below
+    jobs: List[Tuple[Path, List[Dict[str, str]], int, int, List[str]]] = [
+        (OUTPUT_CONSISTENT, rows.to_dicts(consistent), len(rows), len(diff), version_hints),
+        (OUTPUT_DIFF, rows.to_dicts(diff), len(rows), len(diff), version_hints),
+    ]
 
     # split by section into per-section files
-    sections: Dict[str, List[Dict[str, str]]] = {}
-    for r in rows:
-        sec = r.get("section") or "unknown"
-        sections.setdefault(sec, []).append(r)
-    for sec, items in sections.items():
-        sec_consistent, sec_diff = split_rows(items)
-        base = slugify(sec)
-        sec_hints = []
+    sections: Dict[str, List[int]] = {}
+    for i, sec in enumerate(rows.section):
+        sections.setdefault(sec or "unknown", []).append(i)
+    # headings that slugify alike (e.g. "torch.nn" / "torch nn") share one output file;
+    # merge them so every file is written by exactly one job
+    by_slug: Dict[str, List[str]] = {}
+    for sec in sections:
+        by_slug.setdefault(slugify(sec), []).append(sec)
+    for base, names in by_slug.items():
+        items = [i for sec in names for i in sections[sec]]
+        sec_consistent, sec_diff = split_rows(rows, items)
         # collect section/header hints to meta
-        if sec:
-            sec_hints.append(sec)
-        # header field may carry version wording
-        headers = {clean_text(r.get("header", "")) for r in items if r.get("header")}
+        sec_hints = [sec for sec in names if sec]
+        # header field may carry version wording; dict.fromkeys keeps first-seen order
+        headers = dict.fromkeys(clean_text(rows.header[i]) for i in items if rows.header[i])
         for h in headers:
             if h:
                 sec_hints.append(h)
         sec_hints = extract_version_hints(sec_hints) or sec_hints
-        dump_with_meta(
-            OUTPUT_SECTIONS_CONS / f"{base}_consistent.json",
-            sec_consistent,
-            len(items),
-            len(sec_diff),
-            sec_hints,
-        )
-        dump_with_meta(
-            OUTPUT_SECTIONS_DIFF / f"{base}_diff.json",
-            sec_diff,
-            len(items),
-            len(sec_diff),
-            sec_hints,
-        )
+        jobs.append((OUTPUT_SECTIONS_CONS / f"{base}_consistent.json", rows.to_dicts(sec_consistent), len(items), len(sec_diff), sec_hints))
+        jobs.append((OUTPUT_SECTIONS_DIFF / f"{base}_diff.json", rows.to_dicts(sec_diff), len(items), len(sec_diff), sec_hints))
+
+    for out_dir in {job[0].parent for job in jobs}:
+        out_dir.mkdir(parents=True, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=WRITE_WORKERS) as pool:
+        futures = [pool.submit(dump_with_meta, *job) for job in jobs]
+        for fut in futures:
+            fut.result()  # re-raise write errors
+
+    save_fetch_state(URL, fetch_state)
 
     print(f"[INFO] total rows: {len(rows)}, consistent: {len(consistent)}, diff: {len(diff)}")
     print(f"[INFO] version hints: {version_hints}")
@@ -7,33 +7,43 @@
 https://www.mindspore.cn/docs/zh-CN/r2.3.1/note/official_models.html
 输出：
 data/mindspore_official_models.json
+
+上次成功运行的 ETag/Last-Modified 保存在 .http_cache/ 中；页面与脚本代码均未变化时保留现有输出（删除缓存可强制刷新）。
 """
 
 from __future__ import annotations
 
-import json
+import io
+import re
+import sys
 import time
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-import requests
-from bs4 import BeautifulSoup, Tag
+from lxml import etree
+
+if __package__:
+    from ._http import atomic_write, code_version, dumps_json, fetch_if_changed, save_fetch_state
+else:  # run as a plain script: python scripts/update_model_list.py
+    from _http import atomic_write, code_version, dumps_json, fetch_if_changed, save_fetch_state
 
-HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/122.0.0.0 Safari/537.36"
-    )
-}
 INDEX_URL = "https://www.mindspore.cn/docs/zh-CN/r2.3.1/note/official_models.html"
 OUTPUT = Path(__file__).resolve().parent.parent / "data" / "mindspore_official_models.json"
-RETRY = 3
 TIMEOUT = 15
-
-
-@dataclass
+# parser/output code changes invalidate the "page unchanged" skip
+CODE_VERSION = code_version(__file__)
+# XPath queries are compiled once at import instead of being re-parsed per call
+_X_FIRST_TABLE = etree.XPath("(.//table)[1]")
+_X_ROWS = etree.XPath("(.//tr)[position() > 1]")
+_X_CELLS = etree.XPath(".//td")
+_X_TEXT = etree.XPath("string()", smart_strings=False)
+_X_FIRST_HREF = etree.XPath("(.//a/@href)[1]", smart_strings=False)
+_NUM = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+
+@dataclass(slots=True)
 class ModelRow:
     """Standardized model information."""
 
@@ -49,42 +59,27 @@ class ModelRow:
     dataset: Optional[str] = None
     hardware: Optional[Dict[str, Optional[bool]]] = None
 
-    def as_dict(self) -> Dict[str, Any]:
-        """Convert to serializable dictionary."""
-        return {
-            "id": self.id,
-            "name": self.name,
-            "group": self.group,
-            "category": self.category,
-            "task": self.task,
-            "suite": self.suite,
-            "variants": self.variants,
-            "links": self.links,
-            "metrics": self.metrics,
-            "dataset": self.dataset,
-            "hardware": self.hardware,
-        }
-
-
-def get_soup(url: str) -> BeautifulSoup:
-    """Fetch HTML with retries."""
-    parser = "lxml"
-    try:
-        BeautifulSoup("<html></html>", parser)  # type: ignore[arg-type]
-    except Exception:
-        parser = "html.parser"
-    for attempt in range(1, RETRY + 1):
-        try:
-            resp = requests.get(url, headers=HEADERS, timeout=TIMEOUT)
-            resp.raise_for_status()
-            resp.encoding = resp.apparent_encoding or "utf-8"
-            return BeautifulSoup(resp.text, parser)
-        except Exception as exc:  # noqa: BLE001
-            print(f"[WARN] fetch failed {attempt}/{RETRY}: {exc}")
-            if attempt == RETRY:
-                raise
-            time.sleep(2)
-    raise RuntimeError("Unreachable fetch loop")
+    def __post_init__(self) -> None:
+        # low-cardinality labels repeat on every row; share one string object per value
+        self.group = sys.intern(self.group)
+        self.category = sys.intern(self.category)
+        self.task = [sys.intern(t) for t in self.task]
+        if self.suite:
+            self.suite = sys.intern(self.suite)
+        if self.dataset:
+            self.dataset = sys.intern(self.dataset)
+
+
+def fetch_page(url: str, conditional: bool = True) -> Optional[Tuple[bytes, str, Dict[str, str]]]:
+    """Fetch raw HTML bytes, their detected encoding and the new fetch state.
+
+    Returns None if unchanged since the last saved state.
+    """
+    fetched = fetch_if_changed(url, TIMEOUT, CODE_VERSION, conditional)
+    if fetched is None:
+        return None
+    resp, new_state = fetched
+    return resp.content, resp.apparent_encoding or "utf-8", new_state
 
 
 def normalize_text(text: str) -> str:
@@ -92,22 +87,35 @@ def normalize_text(text: str) -> str:
     return " ".join(text.split())
 
 
-def parse_llm(soup: BeautifulSoup) -> List[ModelRow]:
-    section = soup.find("section", {"id": "大语言模型"})
-    if not section:
-        return []
-    table = section.find("table")
-    if not table:
+def to_float(text: str) -> Optional[float]:
+    """Parse a metric cell; None for placeholders like "-" or "n/a" (checked up front, no exception)."""
+    return float(text) if _NUM.fullmatch(text) else None
+
+
+def cell_text(el: etree._Element) -> str:
+    """All text below an element, like BeautifulSoup's get_text()."""
+    return _X_TEXT(el)
+
+
+def cell_href(cell: etree._Element) -> Optional[str]:
+    """Return the first link target in a table cell, if any."""
+    hrefs = _X_FIRST_HREF(cell)
+    return hrefs[0] if hrefs else None
+
+
+def parse_llm(section: etree._Element) -> List[ModelRow]:
+    tables = _X_FIRST_TABLE(section)
+    if not tables:
         return []
     rows: List[ModelRow] = []
-    for tr in table.find_all("tr")[1:]:
-        cells = tr.find_all("td")
+    for tr in _X_ROWS(tables[0]):
+        cells = _X_CELLS(tr)
         if len(cells) < 2:
             continue
         model_cell = cells[0]
-        model_name = normalize_text(model_cell.get_text())
-        card_link = model_cell.find("a").get("href") if model_cell.find("a") else None
-        variants_text = cells[1].get_text()
+        model_name = normalize_text(cell_text(model_cell))
+        card_link = cell_href(model_cell)
+        variants_text = cell_text(cells[1])
         variants = [normalize_text(v) for v in variants_text.split(",") if normalize_text(v)]
         rows.append(
             ModelRow(
@@ -124,25 +132,19 @@ def parse_llm(soup: BeautifulSoup) -> List[ModelRow]:
     return rows
 
 
-def parse_image_classification(soup: BeautifulSoup) -> List[ModelRow]:
-    section = soup.find("section", {"id": "图像分类骨干类"})
-    if not section:
-        return []
-    table = section.find("table")
-    if not table:
+def parse_image_classification(section: etree._Element) -> List[ModelRow]:
+    tables = _X_FIRST_TABLE(section)
+    if not tables:
         return []
     rows: List[ModelRow] = []
-    for tr in table.find_all("tr")[1:]:
-        cells = tr.find_all("td")
+    for tr in _X_ROWS(tables[0]):
+        cells = _X_CELLS(tr)
         if len(cells) < 3:
             continue
-        model_name = normalize_text(cells[0].get_text())
-        acc_text = normalize_text(cells[1].get_text())
-        config_link = cells[2].find("a").get("href") if cells[2].find("a") else None
-        try:
-            acc_value = float(acc_text)
-        except ValueError:
-            acc_value = None
+        model_name = normalize_text(cell_text(cells[0]))
+        acc_text = normalize_text(cell_text(cells[1]))
+        config_link = cell_href(cells[2])
+        acc_value = to_float(acc_text)
         rows.append(
             ModelRow(
                 id=model_name.lower(),
@@ -160,79 +162,55 @@ def parse_image_classification(soup: BeautifulSoup) -> List[ModelRow]:
     return rows
 
 
-def parse_ocr(soup: BeautifulSoup) -> List[ModelRow]:
-    ocr_section = soup.find("section", {"id": "ocr"})
-    if not ocr_section:
+def parse_ocr(section: etree._Element, category_name: str, task_id: str) -> List[ModelRow]:
+    tables = _X_FIRST_TABLE(section)
+    if not tables:
         return []
-    mapping = {
-        "文本检测": ("OCR/文本检测", "text-detection"),
-        "文本识别": ("OCR/文本识别", "text-recognition"),
-        "文本方向分类": ("OCR/文本方向分类", "text-orientation"),
-    }
     rows: List[ModelRow] = []
-    for sub_id, (category_name, task_id) in mapping.items():
-        sub_sec = ocr_section.find("section", {"id": sub_id})
-        if not sub_sec:
-            continue
-        table = sub_sec.find("table")
-        if not table:
+    for tr in _X_ROWS(tables[0]):
+        cells = _X_CELLS(tr)
+        if len(cells) < 4:
             continue
-        for tr in table.find_all("tr")[1:]:
-            cells = tr.find_all("td")
-            if len(cells) < 4:
-                continue
-            model_cell = cells[0]
-            model_name = normalize_text(model_cell.get_text())
-            card_link = model_cell.find("a").get("href") if model_cell.find("a") else None
-            dataset = normalize_text(cells[1].get_text())
-            metric_text = normalize_text(cells[2].get_text())
-            try:
-                fscore = float(metric_text)
-            except ValueError:
-                fscore = None
-            config_link = cells[3].find("a").get("href") if cells[3].find("a") else None
-            rows.append(
-                ModelRow(
-                    id=model_name.lower(),
-                    name=model_name,
-                    group="领域套件与扩展包",
-                    category=category_name,
-                    task=[task_id],
-                    suite="mindocr",
-                    variants=[model_name],
-                    links={"card": card_link, "config": config_link},
-                    metrics={"fscore": fscore} if fscore is not None else None,
-                    dataset=dataset or None,
-                )
+        model_cell = cells[0]
+        model_name = normalize_text(cell_text(model_cell))
+        card_link = cell_href(model_cell)
+        dataset = normalize_text(cell_text(cells[1]))
+        metric_text = normalize_text(cell_text(cells[2]))
+        fscore = to_float(metric_text)
+        config_link = cell_href(cells[3])
+        rows.append(
+            ModelRow(
+                id=model_name.lower(),
+                name=model_name,
+                group="领域套件与扩展包",
+                category=category_name,
+                task=[task_id],
+                suite="mindocr",
+                variants=[model_name],
+                links={"card": card_link, "config": config_link},
+                metrics={"fscore": fscore} if fscore is not None else None,
+                dataset=dataset or None,
             )
+        )
     return rows
 
 
-def parse_object_detection(soup: BeautifulSoup) -> List[ModelRow]:
-    det_sec = soup.find("section", {"id": "目标检测"})
-    if not det_sec:
-        return []
-    yolo_sec = det_sec.find("section", {"id": "yolo系列"})
-    if not yolo_sec:
-        return []
-    table = yolo_sec.find("table")
-    if not table:
+def parse_object_detection(section: etree._Element) -> List[ModelRow]:
+    tables = _X_FIRST_TABLE(section)
+    if not tables:
         return []
     rows: List[ModelRow] = []
-    for tr in table.find_all("tr")[1:]:
-        cells = tr.find_all("td")
+    for tr in _X_ROWS(tables[0]):
+        cells = _X_CELLS(tr)
         if len(cells) < 4:
             continue
         model_cell = cells[0]
-        model_name = normalize_text(model_cell.get_text())
-        card_link = model_cell.find("a").get("href") if model_cell.find("a") else None
-        dataset = normalize_text(cells[1].get_text())
-        metric_text = normalize_text(cells[2].get_text())
-        config_link = cells[3].find("a").get("href") if cells[3].find("a") else None
-        try:
-            map_val = float(metric_text)
-        except ValueError:
-            map_val = None
+        model_name = normalize_text(cell_text(model_cell))
+        card_link = cell_href(model_cell)
+        dataset = normalize_text(cell_text(cells[1]))
+        metric_text = normalize_text(cell_text(cells[2]))
+        config_link = cell_href(cells[3])
+        map_val = to_float(metric_text)
         # 根据链接猜测使用 mindcv 或 mindocr
         suite = "mindocr" if config_link and "mindocr" in config_link else "mindcv"
         rows.append(
@@ -252,27 +230,21 @@ def parse_object_detection(soup: BeautifulSoup) -> List[ModelRow]:
     return rows
 
 
-def parse_reinforcement_learning(soup: BeautifulSoup) -> List[ModelRow]:
-    rl_sec = soup.find("section", {"id": "强化学习"})
-    if not rl_sec:
-        return []
-    table = rl_sec.find("table")
-    if not table:
+def parse_reinforcement_learning(section: etree._Element) -> List[ModelRow]:
+    tables = _X_FIRST_TABLE(section)
+    if not tables:
         return []
     rows: List[ModelRow] = []
-    for tr in table.find_all("tr")[1:]:
-        cells = tr.find_all("td")
+    for tr in _X_ROWS(tables[0]):
+        cells = _X_CELLS(tr)
         if len(cells) < 7:
             continue
         model_cell = cells[0]
-        model_name = normalize_text(model_cell.get_text())
-        card_link = model_cell.find("a").get("href") if model_cell.find("a") else None
-        dataset = normalize_text(cells[6].get_text())
-        score_text = normalize_text(cells[7].get_text()) if len(cells) > 7 else ""
-        try:
-            score_val = float(score_text)
-        except ValueError:
-            score_val = None
+        model_name = normalize_text(cell_text(model_cell))
+        card_link = cell_href(model_cell)
+        dataset = normalize_text(cell_text(cells[6]))
+        score_text = normalize_text(cell_text(cells[7])) if len(cells) > 7 else ""
+        score_val = to_float(score_text)
         rows.append(
             ModelRow(
                 id=model_name.lower(),
@@ -290,27 +262,21 @@ def parse_reinforcement_learning(soup: BeautifulSoup) -> List[ModelRow]:
     return rows
 
 
-def parse_recommendation(soup: BeautifulSoup) -> List[ModelRow]:
-    rec_sec = soup.find("section", {"id": "推荐"})
-    if not rec_sec:
-        return []
-    table = rec_sec.find("table")
-    if not table:
+def parse_recommendation(section: etree._Element) -> List[ModelRow]:
+    tables = _X_FIRST_TABLE(section)
+    if not tables:
         return []
     rows: List[ModelRow] = []
-    for tr in table.find_all("tr")[1:]:
-        cells = tr.find_all("td")
+    for tr in _X_ROWS(tables[0]):
+        cells = _X_CELLS(tr)
         if len(cells) < 5:
             continue
-        model_name = normalize_text(cells[0].get_text())
-        dataset = normalize_text(cells[1].get_text())
-        auc_text = normalize_text(cells[2].get_text())
-        mindrec_link = cells[3].find("a").get("href") if cells[3].find("a") else None
-        ms_link = cells[4].find("a").get("href") if cells[4].find("a") else None
-        try:
-            auc_val = float(auc_text)
-        except ValueError:
-            auc_val = None
+        model_name = normalize_text(cell_text(cells[0]))
+        dataset = normalize_text(cell_text(cells[1]))
+        auc_text = normalize_text(cell_text(cells[2]))
+        mindrec_link = cell_href(cells[3])
+        ms_link = cell_href(cells[4])
+        auc_val = to_float(auc_text)
         rows.append(
             ModelRow(
                 id=model_name.lower(),
@@ -328,25 +294,22 @@ def parse_recommendation(soup: BeautifulSoup) -> List[ModelRow]:
     return rows
 
 
-def parse_scientific_suite(soup: BeautifulSoup) -> List[ModelRow]:
-    sci_sec = soup.find("section", {"id": "科学计算套件"})
-    if not sci_sec:
-        return []
-    table = sci_sec.find("table")
-    if not table:
+def parse_scientific_suite(section: etree._Element) -> List[ModelRow]:
+    tables = _X_FIRST_TABLE(section)
+    if not tables:
         return []
     rows: List[ModelRow] = []
-    for tr in table.find_all("tr")[1:]:
-        cells = tr.find_all("td")
+    for tr in _X_ROWS(tables[0]):
+        cells = _X_CELLS(tr)
         if len(cells) < 5:
             continue
-        domain = normalize_text(cells[0].get_text())
+        domain = normalize_text(cell_text(cells[0]))
         model_cell = cells[1]
-        model_name = normalize_text(model_cell.get_text())
-        card_link = model_cell.find("a").get("href") if model_cell.find("a") else None
-        impl_link = cells[2].find("a").get("href") if cells[2].find("a") else None
-        ascend_text = normalize_text(cells[3].get_text())
-        gpu_text = normalize_text(cells[4].get_text())
+        model_name = normalize_text(cell_text(model_cell))
+        card_link = cell_href(model_cell)
+        impl_link = cell_href(cells[2])
+        ascend_text = normalize_text(cell_text(cells[3]))
+        gpu_text = normalize_text(cell_text(cells[4]))
         rows.append(
             ModelRow(
                 id=model_name.lower(),
@@ -365,34 +328,69 @@ def parse_scientific_suite(soup: BeautifulSoup) -> List[ModelRow]:
     return rows
 
 
+# section id -> (required ancestor section id, parser); output follows this order
+SECTION_PARSERS: Dict[str, Tuple[Optional[str], Callable[[etree._Element], List[ModelRow]]]] = {
+    "大语言模型": (None, parse_llm),
+    "图像分类骨干类": (None, parse_image_classification),
+    "文本检测": ("ocr", partial(parse_ocr, category_name="OCR/文本检测", task_id="text-detection")),
+    "文本识别": ("ocr", partial(parse_ocr, category_name="OCR/文本识别", task_id="text-recognition")),
+    "文本方向分类": ("ocr", partial(parse_ocr, category_name="OCR/文本方向分类", task_id="text-orientation")),
+    "yolo系列": ("目标检测", parse_object_detection),
+    "强化学习": (None, parse_reinforcement_learning),
+    "推荐": (None, parse_recommendation),
+    "科学计算套件": (None, parse_scientific_suite),
+}
+
+
+def parse_models(content: bytes, encoding: str = "utf-8") -> List[ModelRow]:
+    """Stream-parse the page, running each section parser as its <section> closes.
+
+    Sections no parser still needs are cleared right away, so memory stays bounded
+    by the section being parsed rather than the whole document tree.
+    """
+    found: Dict[str, List[ModelRow]] = {}
+    events = etree.iterparse(io.BytesIO(content), events=("end",), tag="section", html=True, encoding=encoding)
+    for _, elem in events:
+        sec_id = elem.get("id")
+        ancestors = [a.get("id") for a in elem.iterancestors("section")]
+        entry = SECTION_PARSERS.get(sec_id)
+        if entry is not None and sec_id not in found:
+            parent_id, parser = entry
+            if parent_id is None or parent_id in ancestors:
+                found[sec_id] = parser(elem)
+        # an enclosing section with a parser has not run yet and still needs this subtree
+        if not any(a in SECTION_PARSERS for a in ancestors):
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+    return [row for sec_id in SECTION_PARSERS for row in found.get(sec_id, [])]
+
+
 def build_payload(models: List[ModelRow]) -> Dict[str, Any]:
-    """Assemble final JSON payload."""
+    """Assemble final JSON payload (rows are serialized directly as dataclasses)."""
     return {
         "version": "r2.3.1",
         "source": INDEX_URL,
         "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
         "count": len(models),
-        "models": [m.as_dict() for m in models],
+        "models": models,
     }
 
 
 def main() -> None:
     print("[INFO] fetching official models page...")
-    soup = get_soup(INDEX_URL)
+    fetched = fetch_page(INDEX_URL, conditional=OUTPUT.exists())
+    if fetched is None:
+        print("[INFO] official models page unchanged since last run, keeping existing output")
+        return
+    content, encoding, fetch_state = fetched
 
-    models: List[ModelRow] = []
-    models.extend(parse_llm(soup))
-    models.extend(parse_image_classification(soup))
-    models.extend(parse_ocr(soup))
-    models.extend(parse_object_detection(soup))
-    models.extend(parse_reinforcement_learning(soup))
-    models.extend(parse_recommendation(soup))
-    models.extend(parse_scientific_suite(soup))
+    models = parse_models(content, encoding)
 
     payload = build_payload(models)
     OUTPUT.parent.mkdir(parents=True, exist_ok=True)
-    with OUTPUT.open("w", encoding="utf-8") as fp:
-        json.dump(payload, fp, ensure_ascii=False, indent=2)
+    atomic_write(OUTPUT, dumps_json(payload, default=asdict))
+    save_fetch_state(INDEX_URL, fetch_state)
     print(f"[INFO] wrote {payload['count']} models -> {OUTPUT}")
 
 
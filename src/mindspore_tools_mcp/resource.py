@@ -3,9 +3,17 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
+from functools import lru_cache
 from pathlib import Path
 from typing import Callable, Dict, Any
 
+try:
+    import orjson
+except ImportError:  # optional: faster (de)serialization, stdlib json otherwise
+    orjson = None
+
 # central registry for resources: uri -> function
 RESOURCE_REGISTRY: Dict[str, Callable] = {}
 
@@ -30,14 +38,36 @@ OPMAP_SECTION_DIFF_DIR = DATA_ROOT / "convert" / "diff"
 
 
 def _load_json(path: Path) -> Any:
-    with path.open("r", encoding="utf-8") as fh:
-        return json.load(fh)
+    raw = path.read_bytes()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+@lru_cache(maxsize=1)
+def _load_models(mtime_ns: int) -> dict:
+    """Parse the models registry once per file version (keyed by mtime)."""
+    return _load_json(MODELS_PATH)
+
+
+def _preload_models() -> None:
+    """Warm the registry cache off the request path; errors resurface on the first real call."""
+    try:
+        _load_models(MODELS_PATH.stat().st_mtime_ns)
+    except Exception:
+        pass
+
+
+# keep the handle: callers join it only while it is running. A process forked
+# mid-preload has no such thread (is_alive() is False) and parses inline.
+_PRELOAD_THREAD = threading.Thread(target=_preload_models, name="preload-official-models", daemon=True)
+_PRELOAD_THREAD.start()
 
 
 @resource("mindspore://models/official")
 def get_official_models() -> dict:
     """Return the full official models registry JSON."""
-    return _load_json(MODELS_PATH)
+    if _PRELOAD_THREAD.is_alive():
+        _PRELOAD_THREAD.join()  # don't parse twice while the preload is still running
+    return _load_models(MODELS_PATH.stat().st_mtime_ns)
 
 
 @resource("mindspore://opmap/pytorch/consistent")
@@ -56,11 +86,14 @@ def _load_sections(folder: Path) -> Dict[str, Any]:
     if not folder.exists():
         return {}
     sections: Dict[str, Any] = {}
-    for file in folder.glob("*.json"):
-        try:
-            sections[file.stem] = _load_json(file)
-        except Exception:
-            continue
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                sections[entry.name[:-5]] = _load_json(Path(entry.path))
+            except Exception:
+                continue
     return sections
 
 
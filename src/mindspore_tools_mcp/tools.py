@@ -3,33 +3,120 @@
 from __future__ import annotations
 
 import json
+import os
 from functools import lru_cache
 import re
+import sys
+from collections import defaultdict
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, NamedTuple
 
+from mindspore_tools_mcp import resource
 from mindspore_tools_mcp.resource import get_official_models
 
-MODEL_FILE = Path(__file__).resolve().parents[2] / "data" / "mindspore_official_models.json"
-OPMAP_CONSISTENT_FILE = Path(__file__).resolve().parents[2] / "data" / "pytorch_ms_api_mapping_consistent.json"
-OPMAP_DIFF_FILE = Path(__file__).resolve().parents[2] / "data" / "pytorch_ms_api_mapping_diff.json"
-OPMAP_SECTION_CONS_DIR = Path(__file__).resolve().parents[2] / "data" / "convert" / "consistent"
-OPMAP_SECTION_DIFF_DIR = Path(__file__).resolve().parents[2] / "data" / "convert" / "diff"
+# 工具注册表：name -> function，由 server 直接读取注册
+TOOL_REGISTRY: dict[str, Callable[..., Any]] = {}
 
-SHAPE_HINT_APIS = {
+
+def tool(name: str | None = None) -> Callable:
+    """装饰器：将函数登记为 MCP 工具（默认使用函数名）。"""
+
+    def decorator(func: Callable) -> Callable:
+        tool_name = name or func.__name__
+        TOOL_REGISTRY[tool_name] = func
+        setattr(func, "__mcp_tool_name__", tool_name)
+        return func
+
+    return decorator
+
+
+# 数据路径统一定义在 resource 中，工具与资源共用同一份文件和解析缓存
+MODEL_FILE = resource.MODELS_PATH
+OPMAP_CONSISTENT_FILE = resource.OPMAP_CONSISTENT
+OPMAP_DIFF_FILE = resource.OPMAP_DIFF
+OPMAP_SECTION_CONS_DIR = resource.OPMAP_SECTION_CONS_DIR
+OPMAP_SECTION_DIFF_DIR = resource.OPMAP_SECTION_DIFF_DIR
+
+# list_models 返回的核心字段，避免多余数据噪声
+PROJECTION_KEYS = ("id", "name", "group", "category", "task", "suite", "variants", "links", "metrics", "dataset", "hardware")
+
+SHAPE_HINT_APIS = frozenset({
     "torch.addmm",
     "torch.mm",
     "torch.matmul",
     "torch.bmm",
-}
+})
+SHAPE_HINT_TEXT = "check input/output shapes (expects matrix/matched dims)"
+
+
+class _RegistryIndex(NamedTuple):
+    """模型清单的查找索引：键均为小写，值为 models 列表下标。"""
+
+    ids: dict[str, int]
+    names: dict[str, int]
+    groups: dict[str, list[int]]
+    categories: dict[str, list[int]]
+    suites: dict[str, list[int]]
+    tasks: dict[str, list[int]]
+    id_lower: list[str]
+    name_lower: list[str]
+    projected: list[dict[str, Any]]
+
+
+def _lower(value: Any) -> str:
+    return value.lower() if isinstance(value, str) else ""
+
+
+_LABEL_KEYS = ("group", "category", "suite", "dataset")
+
+
+def _intern_labels(m: dict[str, Any]) -> None:
+    """驻留低基数标签字符串（与抓取脚本中 ModelRow 的处理一致），仅替换为等值对象。"""
+    for k in _LABEL_KEYS:
+        v = m.get(k)
+        if isinstance(v, str):
+            m[k] = sys.intern(v)
+    tasks = m.get("task")
+    if isinstance(tasks, list):
+        tasks[:] = [sys.intern(t) if isinstance(t, str) else t for t in tasks]
+
+
+def _build_index(models: list[dict[str, Any]]) -> _RegistryIndex:
+    ids: dict[str, int] = {}
+    names: dict[str, int] = {}
+    groups: defaultdict[str, list[int]] = defaultdict(list)
+    categories: defaultdict[str, list[int]] = defaultdict(list)
+    suites: defaultdict[str, list[int]] = defaultdict(list)
+    tasks: defaultdict[str, list[int]] = defaultdict(list)
+    id_lower: list[str] = []
+    name_lower: list[str] = []
+    projected: list[dict[str, Any]] = []
+    for i, m in enumerate(models):
+        _intern_labels(m)
+        mid, name = _lower(m.get("id")), _lower(m.get("name"))
+        id_lower.append(mid)
+        name_lower.append(name)
+        ids.setdefault(mid, i)  # 重名时保留第一条，与线性扫描一致
+        names.setdefault(name, i)
+        groups[_lower(m.get("group"))].append(i)
+        categories[_lower(m.get("category"))].append(i)
+        suites[_lower(m.get("suite"))].append(i)
+        for t in dict.fromkeys(t.lower() for t in m.get("task") or [] if isinstance(t, str)):
+            tasks[t].append(i)
+        projected.append({k: m.get(k) for k in PROJECTION_KEYS if k in m})
+    return _RegistryIndex(
+        ids, names, dict(groups), dict(categories), dict(suites), dict(tasks), id_lower, name_lower, projected
+    )
 
 
 @lru_cache(maxsize=1)
-def _load_registry() -> tuple[dict[str, Any], list[dict[str, Any]]]:
-    """加载模型清单及列表。"""
+def _load_registry() -> tuple[str | None, list[dict[str, Any]], _RegistryIndex]:
+    """加载清单版本号、模型列表及查找索引（清单解析复用 resource 的预加载缓存）。
+
+    只保留工具实际用到的 models 切片与 version，不持有整份清单的引用。
+    """
     try:
-        with MODEL_FILE.open("r", encoding="utf-8") as handle:
-            payload: Any = json.load(handle)
+        payload: Any = get_official_models()
     except FileNotFoundError as exc:
         raise RuntimeError(f"Missing model registry file: {MODEL_FILE}") from exc
     except json.JSONDecodeError as exc:
@@ -40,9 +127,10 @@ def _load_registry() -> tuple[dict[str, Any], list[dict[str, Any]]]:
     models = payload.get("models", [])
     if not isinstance(models, list):
         raise RuntimeError("Model registry 'models' field must be a list")
-    return payload, models
+    return payload.get("version"), models, _build_index(models)
 
 
+@tool()
 def list_models(
     group: str | None = None,
     category: str | None = None,
@@ -51,115 +139,285 @@ def list_models(
     q: str | None = None,
 ) -> list[dict[str, Any]]:
     """列出模型，可按 group/category/task/suite 或名称关键字过滤。"""
-    _, models = _load_registry()
-
-    def match(model: dict[str, Any]) -> bool:
-        if group and model.get("group", "").lower() != group.lower():
-            return False
-        if category and model.get("category", "").lower() != category.lower():
-            return False
-        if suite and model.get("suite", "").lower() != suite.lower():
-            return False
-        if task:
-            tasks = [t.lower() for t in model.get("task", []) if isinstance(t, str)]
-            if task.lower() not in tasks:
-                return False
-        if q:
-            q_lower = q.lower()
-            if q_lower not in model.get("id", "").lower() and q_lower not in model.get("name", "").lower():
-                return False
-        return True
-
-    filtered = [m for m in models if match(m)]
-
-    # 仅返回核心字段，避免多余数据噪声
-    projection_keys = {"id", "name", "group", "category", "task", "suite", "variants", "links", "dataset", "metrics", "hardware"}
-    projected: list[dict[str, Any]] = []
-    for m in filtered:
-        projected.append({k: m.get(k) for k in projection_keys if k in m})
-    return projected
-
-
+    return list(_list_models_cached(group, category, task, suite, q))
+
+
+@lru_cache(maxsize=256)
+def _list_models_cached(
+    group: str | None,
+    category: str | None,
+    task: str | None,
+    suite: str | None,
+    q: str | None,
+) -> tuple[dict[str, Any], ...]:
+    """按过滤条件缓存结果；元素为预先投影好的共享字典，调用方不得修改。"""
+    _, models, index = _load_registry()
+
+    # 精确过滤走倒排索引，从最小的候选集开始求交
+    postings = [
+        table.get(value.lower(), [])
+        for value, table in (
+            (group, index.groups),
+            (category, index.categories),
+            (suite, index.suites),
+            (task, index.tasks),
+        )
+        if value
+    ]
+    candidates: list[int] | range = range(len(models))
+    if postings:
+        postings.sort(key=len)
+        selected = set(postings[0])
+        for other in postings[1:]:
+            selected.intersection_update(other)
+        candidates = sorted(selected)
+    if q:
+        q_lower = q.lower()
+        id_lower, name_lower = index.id_lower, index.name_lower
+        if postings:
+            candidates = [i for i in candidates if q_lower in id_lower[i] or q_lower in name_lower[i]]
+        else:
+            # 无精确过滤时直接顺序扫描两列，省去逐行下标访问
+            candidates = [
+                i for i, (mid, name) in enumerate(zip(id_lower, name_lower)) if q_lower in mid or q_lower in name
+            ]
+
+    return tuple(index.projected[i] for i in candidates)
+
+
+@tool()
 def get_model_info(model_id: str) -> dict[str, Any]:
     """按 id 或 name（不区分大小写）返回完整模型记录。"""
-    payload, models = _load_registry()
+    version, models, index = _load_registry()
     needle = model_id.lower()
-    for m in models:
-        if m.get("id", "").lower() == needle or m.get("name", "").lower() == needle:
-            return m
-    raise ValueError(f"Model '{model_id}' not found in registry (version={payload.get('version')})")
+    hits = [i for i in (index.ids.get(needle), index.names.get(needle)) if i is not None]
+    if hits:
+        return models[min(hits)]
+    raise ValueError(f"Model '{model_id}' not found in registry (version={version})")
 
 
+@tool()
 def fetch_official_models() -> dict:
     """返回官方模型清单的完整 JSON。"""
     return get_official_models()
 
 
+@lru_cache(maxsize=None)
 def _load_json(path: Path) -> Any:
+    """读取映射 JSON；进程内缓存，同一文件只解析一次。"""
     try:
-        with path.open("r", encoding="utf-8") as fh:
-            return json.load(fh)
+        return resource._load_json(path)
     except FileNotFoundError as exc:
         raise RuntimeError(f"Missing mapping file: {path}") from exc
     except json.JSONDecodeError as exc:
         raise RuntimeError(f"Invalid JSON payload in mapping: {path}") from exc
 
 
+@lru_cache(maxsize=None)
 def _load_section_map(folder: Path) -> dict[str, Any]:
     data: dict[str, Any] = {}
     if not folder.exists():
         return data
-    for file in folder.glob("*.json"):
-        try:
-            data[file.stem] = _load_json(file)
-        except Exception:
-            continue
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                data[entry.name[:-5]] = _load_json(Path(entry.path))
+            except Exception:
+                continue
     return data
 
 
+# 没有任何分表的 section 共用的缓存键（只用基础映射表）；"\0" 不可能出现在文件名中
+_BASE_ONLY = "\0"
+
+
+def _section_key(section: str | None) -> str | None:
+    """把 section 规范化为缓存键：未指定为 None，有分表时为其本身，否则统一为 _BASE_ONLY。
+
+    避免任意未知 section 名各自占用一份按 section 缓存的表和扫描器。
+    """
+    if not section:
+        return None
+    if section == _BASE_ONLY or os.sep in section or (os.altsep and os.altsep in section):
+        return _BASE_ONLY
+    name = f"{section}.json"
+    if (OPMAP_SECTION_CONS_DIR / name).is_file() or (OPMAP_SECTION_DIFF_DIR / name).is_file():
+        return section
+    return _BASE_ONLY
+
+
+def _load_section_file(folder: Path, section: str) -> Any:
+    """只读取单个 section 分表（键与 _load_section_map 相同，即文件名 stem），缺失或损坏时返回 {}。"""
+    if section == _BASE_ONLY or os.sep in section or (os.altsep and os.altsep in section):
+        return {}
+    try:
+        return _load_json(folder / f"{section}.json")
+    except Exception:
+        return {}
+
+
+def _items(payload: Any) -> list[dict[str, Any]]:
+    return payload.get("items", []) if isinstance(payload, dict) else []
+
+
+@lru_cache(maxsize=32)
+def _get_mapping_tables(section: str | None = None) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """基础一致/差异映射 + section 分表（未指定 section 时合并所有分表）。
+
+    结果按 section 缓存（section 应先经 _section_key 规范化），调用方不得修改返回的列表。
+    """
+    cons_items = list(_items(_load_json(OPMAP_CONSISTENT_FILE)))
+    diff_items = list(_items(_load_json(OPMAP_DIFF_FILE)))
+
+    if section:
+        # 指定 section 时只读对应分表，不加载整个目录
+        cons_items += _items(_load_section_file(OPMAP_SECTION_CONS_DIR, section))
+        diff_items += _items(_load_section_file(OPMAP_SECTION_DIFF_DIR, section))
+    else:
+        # 未指定 section 时合并所有分表，覆盖更多映射（如 torch_tensor 等）
+        for sec in _load_section_map(OPMAP_SECTION_CONS_DIR).values():
+            cons_items += _items(sec)
+        for sec in _load_section_map(OPMAP_SECTION_DIFF_DIR).values():
+            diff_items += _items(sec)
+    return cons_items, diff_items
+
+
 def _sorted_items(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
     """按 PyTorch API 长度排序，优先匹配更长的名称。"""
     return sorted(items, key=lambda r: len(r.get("pytorch", "")), reverse=True)
 
 
+@lru_cache(maxsize=32)
 def _collect_mapping_items(section: str | None = None) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
-    """汇总一致/差异映射条目，可选按 section 限定。"""
-    base_cons = _load_json(OPMAP_CONSISTENT_FILE)
-    base_diff = _load_json(OPMAP_DIFF_FILE)
-    cons_items = base_cons.get("items", []) if isinstance(base_cons, dict) else []
-    diff_items = base_diff.get("items", []) if isinstance(base_diff, dict) else []
-
+    """汇总一致/差异映射条目（已排序并缓存），可选按 section 限定（section 应先经 _section_key 规范化）。"""
     if section:
-        sec_cons_all = _load_section_map(OPMAP_SECTION_CONS_DIR)
-        sec_diff_all = _load_section_map(OPMAP_SECTION_DIFF_DIR)
-        cons_sec = sec_cons_all.get(section, {})
-        diff_sec = sec_diff_all.get(section, {})
+        cons_items = _items(_load_json(OPMAP_CONSISTENT_FILE))
+        diff_items = _items(_load_json(OPMAP_DIFF_FILE))
+        cons_sec = _load_section_file(OPMAP_SECTION_CONS_DIR, section)
+        diff_sec = _load_section_file(OPMAP_SECTION_DIFF_DIR, section)
         if cons_sec and isinstance(cons_sec, dict):
             cons_items = cons_sec.get("items", cons_items)
         if diff_sec and isinstance(diff_sec, dict):
             diff_items = diff_sec.get("items", diff_items)
     else:
-        # 未指定 section 时合并所有分表，覆盖更多映射（如 torch_tensor 等）
-        sec_cons_all = _load_section_map(OPMAP_SECTION_CONS_DIR)
-        sec_diff_all = _load_section_map(OPMAP_SECTION_DIFF_DIR)
-        for sec in sec_cons_all.values():
-            if isinstance(sec, dict):
-                cons_items += sec.get("items", [])
-        for sec in sec_diff_all.values():
-            if isinstance(sec, dict):
-                diff_items += sec.get("items", [])
+        cons_items, diff_items = _get_mapping_tables(None)
 
     return _sorted_items(cons_items), _sorted_items(diff_items)
 
 
-def _count_occurrences(text: str, target: str) -> int:
-    """统计边界安全的目标符号出现次数。"""
-    if not target:
-        return 0
-    pattern = rf"(?<![\w.]){re.escape(target)}(?![\w.])"
-    return len(list(re.finditer(pattern, text)))
+_SIMPLE_KEY = re.compile(r"[\w.]+")
+
+
+class _KeyScanner:
+    """一次扫描定位文本中出现的全部映射键，避免逐条正则全文匹配。
+
+    仅由 [\\w.] 组成的键合并为一个长键优先的交替正则：边界断言保证每次命中
+    恰好覆盖一整段 [\\w.] 字符，因此一次 finditer 即可得到与逐键匹配一致的结果。
+    其它键（如 "-"）可能与相邻匹配重叠，逐条单独查找。
+    """
+
+    def __init__(self, keys: list[str]) -> None:
+        simple = sorted({k for k in keys if _SIMPLE_KEY.fullmatch(k)}, key=len, reverse=True)
+        self.union = (
+            re.compile(rf"(?<![\w.])(?:{'|'.join(map(re.escape, simple))})(?![\w.])") if simple else None
+        )
+        self.always = frozenset(k for k in keys if k and not _SIMPLE_KEY.fullmatch(k))
+
+    def scan(self, text: str) -> dict[str, list[int]]:
+        """返回 {键: 边界安全命中的起始偏移（升序）}，仅包含出现过的键。"""
+        found: dict[str, list[int]] = defaultdict(list)
+        if not text:
+            return found
+        if self.union:
+            for m in self.union.finditer(text):
+                found[m.group(0)].append(m.start())
+        for key in self.always:
+            offsets = _find_occurrences(text, key)
+            if offsets:
+                found[key] = offsets
+        return found
+
+
+_ENTRY_KEYS = ("section", "pytorch", "mindspore", "description")
+
+
+def _base_entry(row: dict[str, Any]) -> dict[str, Any]:
+    return {k: row.get(k) for k in _ENTRY_KEYS}
+
+
+class _MappingLookup(NamedTuple):
+    """按 section 预建的扫描器、映射键到（已排序）条目下标的倒排表，以及各条目的结果模板。"""
+
+    cons_pt: _KeyScanner
+    cons_ms: _KeyScanner
+    diff_pt: _KeyScanner
+    cons_rows_by_pt: dict[str, list[int]]
+    cons_rows_by_ms: dict[str, list[int]]
+    diff_rows_by_pt: dict[str, list[int]]
+    cons_entries: tuple[dict[str, Any], ...]
+    diff_entries: tuple[dict[str, Any], ...]
+
+
+@lru_cache(maxsize=16)
+def _mapping_lookup(section: str | None = None) -> _MappingLookup:
+    """按 section 缓存查找结构；只收录能产生诊断结果的条目（一致映射需两侧键均非空）。
+
+    section 应先经 _section_key 规范化；缓存有上限，扫描器正则较大。
+    """
+    cons_items, diff_items = _collect_mapping_items(section)
+    cons_by_pt: defaultdict[str, list[int]] = defaultdict(list)
+    cons_by_ms: defaultdict[str, list[int]] = defaultdict(list)
+    diff_by_pt: defaultdict[str, list[int]] = defaultdict(list)
+    for i, row in enumerate(cons_items):
+        pt, ms = row.get("pytorch", ""), row.get("mindspore", "")
+        if pt and ms:
+            cons_by_pt[pt].append(i)
+            cons_by_ms[ms].append(i)
+    for i, row in enumerate(diff_items):
+        pt = row.get("pytorch", "")
+        if pt:
+            diff_by_pt[pt].append(i)
+    return _MappingLookup(
+        _KeyScanner(list(cons_by_pt)),
+        _KeyScanner(list(cons_by_ms)),
+        _KeyScanner(list(diff_by_pt)),
+        dict(cons_by_pt),
+        dict(cons_by_ms),
+        dict(diff_by_pt),
+        tuple(map(_base_entry, cons_items)),
+        tuple(map(_base_entry, diff_items)),
+    )
+
 
+# ASCII 部分的 [\\w.] 字符集；集合查找比逐字符调用 str.isalnum 更快
+_ASCII_WORD_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_.")
 
+
+def _is_word_char(ch: str) -> bool:
+    """与正则 [\\w.] 等价：字母数字、下划线或点号；非 ASCII 字符回退到 str.isalnum。"""
+    return ch in _ASCII_WORD_CHARS or (ch >= "\x80" and ch.isalnum())
+
+
+def _find_occurrences(text: str, target: str) -> list[int]:
+    """边界安全的目标符号起始偏移（不重叠，与 finditer 语义一致）。"""
+    if not target:
+        return []
+    n, size = len(text), len(target)
+    offsets: list[int] = []
+    i = text.find(target)
+    while i >= 0:
+        end = i + size
+        if (i == 0 or not _is_word_char(text[i - 1])) and (end == n or not _is_word_char(text[end])):
+            offsets.append(i)
+            i = text.find(target, end)
+        else:
+            i = text.find(target, i + 1)
+    return offsets
+
+
+@tool()
 def query_op_mapping(op: str, section: str | None = None) -> dict[str, list[dict[str, str]]]:
     """查询 PyTorch→MindSpore API 映射（支持 section 过滤与模糊匹配）。
 
@@ -175,30 +433,7 @@ def query_op_mapping(op: str, section: str | None = None) -> dict[str, list[dict
         pt = row.get("pytorch", "").lower()
         return key in pt
 
-    # load data
-    base_cons = _load_json(OPMAP_CONSISTENT_FILE)
-    base_diff = _load_json(OPMAP_DIFF_FILE)
-    cons_items = base_cons.get("items", []) if isinstance(base_cons, dict) else []
-    diff_items = base_diff.get("items", []) if isinstance(base_diff, dict) else []
-
-    sec_cons_all = _load_section_map(OPMAP_SECTION_CONS_DIR)
-    sec_diff_all = _load_section_map(OPMAP_SECTION_DIFF_DIR)
-
-    if section:
-        cons_sec = sec_cons_all.get(section, {})
-        diff_sec = sec_diff_all.get(section, {})
-        if cons_sec and isinstance(cons_sec, dict):
-            cons_items = cons_items + cons_sec.get("items", [])
-        if diff_sec and isinstance(diff_sec, dict):
-            diff_items = diff_items + diff_sec.get("items", [])
-    else:
-        # 未指定 section 时合并所有分表，覆盖更多映射（如 torch_tensor 等）
-        for sec in sec_cons_all.values():
-            if isinstance(sec, dict):
-                cons_items += sec.get("items", [])
-        for sec in sec_diff_all.values():
-            if isinstance(sec, dict):
-                diff_items += sec.get("items", [])
+    cons_items, diff_items = _get_mapping_tables(_section_key(section))
 
     cons_hits = [r for r in cons_items if match_row(r)]
     diff_hits = [r for r in diff_items if match_row(r)]
@@ -209,6 +444,7 @@ def query_op_mapping(op: str, section: str | None = None) -> dict[str, list[dict
     }
 
 
+@tool()
 def diagnose_translation(original_code: str, translated_code: str, section: str | None = None) -> dict[str, Any]:
     """诊断 LLM 翻译结果：基于映射表检查替换是否到位。
 
@@ -226,30 +462,52 @@ def diagnose_translation(original_code: str, translated_code: str, section: str
             "annotated": "...",          # 在原文标注 TODO 的版本
         }
     """
+    empty = {
+        "applied_mappings": [],
+        "missing_mappings": [],
+        "diff_hits": [],
+        "extra_calls": [],
+        "annotated": original_code,
+    }
+    if not original_code and not translated_code:
+        return empty  # 无输入时不必加载映射表
+
+    section = _section_key(section)
+    lookup = _mapping_lookup(section)
+    # 每段代码只整体扫描一次，得到各映射键的命中位置
+    source_hits = lookup.cons_pt.scan(original_code)
+    translated_hits = lookup.cons_ms.scan(translated_code)
+    diff_pt_hits = lookup.diff_pt.scan(original_code)
+    if not source_hits and not translated_hits and not diff_pt_hits:
+        return empty  # 没有任何映射键命中，跳过逐行遍历
+
     cons_items, diff_items = _collect_mapping_items(section)
+    # 原文偏移 -> 待插入的 TODO 注释（按添加顺序去重），最后一次性拼接
+    notes: dict[int, list[str]] = defaultdict(list)
+
+    def annotate(offsets: list[int], comment: str) -> None:
+        for offset in offsets:
+            if comment not in notes[offset]:
+                notes[offset].append(comment)
 
     applied: list[dict[str, Any]] = []
     missing: list[dict[str, Any]] = []
     extra: list[dict[str, Any]] = []
     diff_hits: list[dict[str, Any]] = []
-    annotated = original_code
 
-    def base_entry(row: dict[str, Any]) -> dict[str, Any]:
-        return {k: row.get(k) for k in ("section", "pytorch", "mindspore", "description")}
+    # 只访问命中键对应的条目，按排序后的下标保持原有输出顺序
+    cons_rows = {i for k in source_hits for i in lookup.cons_rows_by_pt[k]}
+    cons_rows.update(i for k in translated_hits for i in lookup.cons_rows_by_ms[k])
+    diff_rows = {i for k in diff_pt_hits for i in lookup.diff_rows_by_pt[k]}
 
     # 一致映射：检查源代码命中与译文替换情况
-    for row in cons_items:
-        pt = row.get("pytorch", "")
-        ms = row.get("mindspore", "")
-        if not pt or not ms:
-            continue
-        source_count = _count_occurrences(original_code, pt)
-        translated_count = _count_occurrences(translated_code, ms) if translated_code else 0
-        if source_count == 0 and translated_count == 0:
-            continue
-        entry = base_entry(row)
-        entry["source_count"] = source_count
-        entry["translated_count"] = translated_count
+    for i in sorted(cons_rows):
+        row = cons_items[i]
+        pt, ms = row["pytorch"], row["mindspore"]
+        source_count = len(source_hits.get(pt, ()))
+        translated_count = len(translated_hits.get(ms, ()))
+        # 模板为缓存共享对象，结果中的条目必须是新字典
+        entry = {**lookup.cons_entries[i], "source_count": source_count, "translated_count": translated_count}
         applied.append(entry)
         if source_count > 0 and translated_count == 0:
             missing.append(entry)
@@ -259,24 +517,17 @@ def diagnose_translation(original_code: str, translated_code: str, section: str
             extra.append(extra_entry)
 
     # 差异映射：仅提示，不自动替换
-    for row in diff_items:
-        pt = row.get("pytorch", "")
-        if not pt:
-            continue
-        source_count = _count_occurrences(original_code, pt)
-        if source_count == 0:
-            continue
-        entry = base_entry(row)
-        entry["count"] = source_count
+    for i in sorted(diff_rows):
+        row = diff_items[i]
+        pt = row["pytorch"]
+        source_count = len(diff_pt_hits[pt])
+        entry = {**lookup.diff_entries[i], "count": source_count}
         if pt in SHAPE_HINT_APIS:
-            entry["shape_hint"] = "check input/output shapes (expects matrix/matched dims)"
+            entry["shape_hint"] = SHAPE_HINT_TEXT
         diff_hits.append(entry)
-        pattern = rf"(?<![\w.]){re.escape(pt)}(?![\w.])"
         desc = row.get("description") or "diff"
         ms = row.get("mindspore") or "mindspore.*"
-        def add_comment(match: re.Match[str]) -> str:
-            return f"# TODO: check mapping {pt} -> {ms}: {desc}\n{match.group(0)}"
-        annotated = re.sub(pattern, add_comment, annotated)
+        annotate(diff_pt_hits[pt], f"# TODO: check mapping {pt} -> {ms}: {desc}\n")
 
     # 对未替换的命中添加标注，便于人工复核
     for miss in missing:
@@ -284,10 +535,17 @@ def diagnose_translation(original_code: str, translated_code: str, section: str
         ms = miss.get("mindspore") or "mindspore.*"
         if not pt:
             continue
-        pattern = rf"(?<![\w.]){re.escape(pt)}(?![\w.])"
-        def add_comment(match: re.Match[str]) -> str:
-            return f"# TODO: replace {pt} -> {ms} per mapping\n{match.group(0)}"
-        annotated = re.sub(pattern, add_comment, annotated)
+        annotate(source_hits[pt], f"# TODO: replace {pt} -> {ms} per mapping\n")
+
+    # 在原文上单次拼接：注释插在各命中位置之前，不会再匹配到已插入的注释
+    parts: list[str] = []
+    cursor = 0
+    for offset in sorted(notes):
+        parts.append(original_code[cursor:offset])
+        parts.extend(notes[offset])
+        cursor = offset
+    parts.append(original_code[cursor:])
+    annotated = "".join(parts)
 
     return {
         "applied_mappings": applied,
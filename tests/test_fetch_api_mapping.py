@@ -0,0 +1,83 @@
+import json
+from pathlib import Path
+
+from scripts import fetch_api_mapping
+
+FIXTURE = Path(__file__).parent / "fixtures" / "api_mapping.html"
+
+HDR_21 = "PyTorch 2.1 APIs MindSpore APIs Descriptions"
+HDR_181 = "PyTorch 1.8.1 APIs MindSpore APIs Descriptions"
+HDR_TV = "TorchVision 0.9.1 APIs MindSpore APIs Descriptions"
+
+
+def _row(section: str, header: str, pytorch: str, mindspore: str, description: str) -> dict:
+    return {"section": section, "header": header, "pytorch": pytorch, "mindspore": mindspore, "description": description}
+
+
+ABS = _row("torch", HDR_21, "torch.abs", "mindspore.mint.abs", "Consistent")
+ADDMM = _row("torch", HDR_21, "torch.addmm", "mindspore.mint.addmm", "Differences")
+RELU = _row("torch.nn", HDR_181, "torch.nn.ReLU", "mindspore.mint.nn.ReLU", "consistent")
+NMS = _row("torch nn", HDR_TV, "torchvision.ops.nms", "mindspore.ops.NMSWithMask", "Differences")
+
+
+def test_parse_mapping_fixture():
+    rows, hints = fetch_api_mapping.parse_mapping(FIXTURE.read_text(encoding="utf-8"))
+
+    # thead rows and short rows are skipped; the Name/Meaning table is not a mapping table
+    assert rows.to_dicts(range(len(rows))) == [ABS, ADDMM, RELU, NMS]
+    assert fetch_api_mapping.split_rows(rows) == ([0, 2], [1, 3])
+    assert fetch_api_mapping.split_rows(rows, [1, 2]) == ([2], [1])
+    # hints come from the table headers; the <code> sample is not scanned
+    assert hints == [HDR_21, HDR_181, HDR_TV]
+
+
+def test_parse_mapping_hint_fallback():
+    html = """<html><body>
+    <h2>Overview</h2>
+    <p>Supports MindSpore 2.3 and PyTorch 2.1.</p>
+    <p>Supports MindSpore 2.3 and PyTorch 2.1.</p>
+    <pre><code>import torch  # PyTorch 1.8 version</code></pre>
+    <p>Inline <code>mindspore 2.3 version</code> code.</p>
+    <table><tr><th>Name</th><th>Meaning</th></tr><tr><td>a</td><td>b</td></tr></table>
+    </body></html>"""
+    rows, hints = fetch_api_mapping.parse_mapping(html)
+    assert len(rows) == 0
+    # no heading/header carries version wording: fall back to visible prose, deduplicated, code excluded
+    assert hints == ["Supports MindSpore 2.3 and PyTorch 2.1."]
+
+
+def test_main_writes_per_section_files(tmp_path, monkeypatch):
+    html = FIXTURE.read_text(encoding="utf-8")
+    monkeypatch.setattr(fetch_api_mapping, "fetch_html", lambda url, conditional=True: (html, {}))
+    monkeypatch.setattr(fetch_api_mapping, "save_fetch_state", lambda url, state: None)
+    monkeypatch.setattr(fetch_api_mapping, "OUTPUT_CONSISTENT", tmp_path / "consistent.json")
+    monkeypatch.setattr(fetch_api_mapping, "OUTPUT_DIFF", tmp_path / "diff.json")
+    monkeypatch.setattr(fetch_api_mapping, "OUTPUT_SECTIONS_CONS", tmp_path / "convert" / "consistent")
+    monkeypatch.setattr(fetch_api_mapping, "OUTPUT_SECTIONS_DIFF", tmp_path / "convert" / "diff")
+    fetch_api_mapping.main()
+
+    def load(rel: str) -> dict:
+        return json.loads((tmp_path / rel).read_text(encoding="utf-8"))
+
+    assert load("consistent.json")["items"] == [ABS, RELU]
+    assert load("diff.json")["items"] == [ADDMM, NMS]
+    assert load("diff.json")["meta"]["total_rows"] == 4
+    assert load("diff.json")["meta"]["diff_rows"] == 2
+
+    assert sorted(p.name for p in (tmp_path / "convert" / "consistent").iterdir()) == [
+        "torch_consistent.json",
+        "torch_nn_consistent.json",
+    ]
+    torch_diff = load("convert/diff/torch_diff.json")
+    assert torch_diff["items"] == [ADDMM]
+    assert torch_diff["meta"]["version_hints"] == [HDR_21]
+    assert load("convert/consistent/torch_consistent.json")["items"] == [ABS]
+
+    # "torch.nn" and "torch nn" slugify alike and share one pair of files
+    nn_cons = load("convert/consistent/torch_nn_consistent.json")
+    nn_diff = load("convert/diff/torch_nn_diff.json")
+    assert nn_cons["items"] == [RELU]
+    assert nn_diff["items"] == [NMS]
+    assert nn_diff["meta"]["total_rows"] == 2
+    assert nn_diff["meta"]["diff_rows"] == 1
+    assert nn_diff["meta"]["version_hints"] == [HDR_181, HDR_TV]
@@ -0,0 +1,108 @@
+import hashlib
+
+import pytest
+import requests
+
+from scripts import _http
+
+URL = "https://example.invalid/page.html"
+BODY = b"<html>page</html>"
+DIGEST = hashlib.sha256(BODY).hexdigest()
+
+
+def _response(status: int, body: bytes = b"", headers: dict | None = None) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = status
+    resp._content = body
+    resp.headers.update(headers or {})
+    resp.url = URL
+    return resp
+
+
+@pytest.fixture
+def session_get(tmp_path, monkeypatch):
+    """Keep fetch state in tmp_path and answer SESSION.get with a queued response, recording request headers."""
+    monkeypatch.setattr(_http, "HTTP_CACHE_DIR", tmp_path / ".http_cache")
+    sent: list[dict] = []
+    replies: list[requests.Response] = []
+
+    def fake_get(url, headers=None, timeout=None):
+        sent.append(dict(headers or {}))
+        return replies.pop(0)
+
+    monkeypatch.setattr(_http.SESSION, "get", fake_get)
+    return sent, replies
+
+
+def _save(version: str = "v1") -> None:
+    _http.save_fetch_state(
+        URL, {"etag": '"e1"', "last_modified": "Mon, 01 Jan 2024 00:00:00 GMT", "sha256": DIGEST, "code_version": version}
+    )
+
+
+def test_not_modified_skips(session_get):
+    sent, replies = session_get
+    _save()
+    replies.append(_response(304))
+    assert _http.fetch_if_changed(URL, 5, "v1") is None
+    assert sent == [{"If-None-Match": '"e1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}]
+
+
+def test_same_body_hash_skips(session_get):
+    _, replies = session_get
+    _save()
+    replies.append(_response(200, BODY))
+    assert _http.fetch_if_changed(URL, 5, "v1") is None
+
+
+def test_new_code_version_forces_processing(session_get):
+    sent, replies = session_get
+    _save(version="v0")
+    replies.append(_response(200, BODY, {"ETag": '"e2"'}))
+    fetched = _http.fetch_if_changed(URL, 5, "v1")
+    assert fetched is not None
+    resp, state = fetched
+    assert resp.content == BODY
+    assert state == {"etag": '"e2"', "last_modified": "", "sha256": DIGEST, "code_version": "v1"}
+    # stale validators are not sent either
+    assert sent == [{}]
+
+
+def test_unconditional_ignores_saved_state(session_get):
+    sent, replies = session_get
+    _save()
+    replies.append(_response(200, BODY))
+    assert _http.fetch_if_changed(URL, 5, "v1", conditional=False) is not None
+    assert sent == [{}]
+
+
+def test_http_error_raises(session_get):
+    _, replies = session_get
+    replies.append(_response(500))
+    with pytest.raises(requests.HTTPError):
+        _http.fetch_if_changed(URL, 5, "v1")
+
+
+def test_atomic_write_replaces_target(tmp_path):
+    target = tmp_path / "out.json"
+    target.write_bytes(b"old")
+    _http.atomic_write(target, b"new")
+    assert target.read_bytes() == b"new"
+    assert [p.name for p in tmp_path.iterdir()] == ["out.json"]
+
+
+def test_atomic_write_failure_leaves_no_temp(tmp_path, monkeypatch):
+    target = tmp_path / "out.json"
+    target.write_bytes(b"old")
+
+    def fail_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(_http.os, "replace", fail_replace)
+    with pytest.raises(OSError):
+        _http.atomic_write(target, b"new")
+    monkeypatch.undo()
+    with pytest.raises(TypeError):
+        _http.atomic_write(target, "not bytes")  # fails inside the write itself
+    assert target.read_bytes() == b"old"
+    assert [p.name for p in tmp_path.iterdir()] == ["out.json"]
@@ -0,0 +1,205 @@
+from pathlib import Path
+
+import pytest
+
+from mindspore_tools_mcp import tools
+
+MAPPING = Path(__file__).parent / "fixtures" / "mapping"
+
+_CACHED = (
+    tools._load_json,
+    tools._load_section_map,
+    tools._get_mapping_tables,
+    tools._collect_mapping_items,
+    tools._mapping_lookup,
+)
+
+
+def _clear_caches() -> None:
+    for fn in _CACHED:
+        fn.cache_clear()
+
+
+@pytest.fixture
+def mapping_tables(monkeypatch):
+    monkeypatch.setattr(tools, "OPMAP_CONSISTENT_FILE", MAPPING / "consistent.json")
+    monkeypatch.setattr(tools, "OPMAP_DIFF_FILE", MAPPING / "diff.json")
+    monkeypatch.setattr(tools, "OPMAP_SECTION_CONS_DIR", MAPPING / "convert" / "consistent")
+    monkeypatch.setattr(tools, "OPMAP_SECTION_DIFF_DIR", MAPPING / "convert" / "diff")
+    _clear_caches()
+    yield
+    _clear_caches()
+
+
+def _cons(pt: str, ms: str, source_count: int, translated_count: int) -> dict:
+    return {
+        "section": "torch",
+        "pytorch": pt,
+        "mindspore": ms,
+        "description": "Consistent",
+        "source_count": source_count,
+        "translated_count": translated_count,
+    }
+
+
+ORIGINAL = (
+    "x = torch.abs(a) - torch.add(a, b)\n"
+    "y = （torch.abs(x)）\n"
+    "z = étorch.abs(x) + torch.addmm(m, a, b)\n"
+    "w = 中-文 + a)-1\n"
+)
+TRANSLATED = "x = mindspore.mint.add(a, b)\ny = mindspore.mint.exp(a)\n"
+
+
+def test_diagnose_translation_merged_tables(mapping_tables):
+    result = tools.diagnose_translation(ORIGINAL, TRANSLATED)
+
+    # torch.abs / torch.addmm appear in both the base and the torch section tables;
+    # every row is reported, but each hit is annotated once.
+    # "étorch.abs" and "中-文" have word-character neighbours and do not count; "（" does not block a match.
+    abs_row = _cons("torch.abs", "mindspore.mint.abs", 2, 0)
+    assert result["applied_mappings"] == [
+        abs_row,
+        _cons("torch.add", "mindspore.mint.add", 1, 1),
+        abs_row,
+        _cons("torch.exp", "mindspore.mint.exp", 0, 1),
+    ]
+    assert result["missing_mappings"] == [abs_row, abs_row]
+    addmm_hit = {
+        "section": "torch",
+        "pytorch": "torch.addmm",
+        "mindspore": "mindspore.mint.addmm",
+        "description": "Differences",
+        "count": 1,
+        "shape_hint": tools.SHAPE_HINT_TEXT,
+    }
+    assert result["diff_hits"] == [
+        addmm_hit,
+        addmm_hit,
+        {
+            "section": "torch",
+            "pytorch": "-",
+            "mindspore": "mindspore.ops.Custom",
+            "description": "No corresponding API",
+            "count": 1,
+        },
+    ]
+    assert result["extra_calls"] == [
+        {
+            **_cons("torch.exp", "mindspore.mint.exp", 0, 1),
+            "note": "MindSpore API present but no matching PyTorch call found",
+        }
+    ]
+    # comments are spliced into the original once, never into previously inserted text
+    assert result["annotated"] == (
+        "x = # TODO: replace torch.abs -> mindspore.mint.abs per mapping\n"
+        "torch.abs(a) # TODO: check mapping - -> mindspore.ops.Custom: No corresponding API\n"
+        "- torch.add(a, b)\n"
+        "y = （# TODO: replace torch.abs -> mindspore.mint.abs per mapping\n"
+        "torch.abs(x)）\n"
+        "z = étorch.abs(x) + # TODO: check mapping torch.addmm -> mindspore.mint.addmm: Differences\n"
+        "torch.addmm(m, a, b)\n"
+        "w = 中-文 + a)-1\n"
+    )
+
+
+def test_diagnose_translation_section(mapping_tables):
+    # a section file replaces the matching base table
+    result = tools.diagnose_translation(ORIGINAL, TRANSLATED, section="torch_consistent")
+    assert result["applied_mappings"] == [
+        _cons("torch.abs", "mindspore.mint.abs", 2, 0),
+        _cons("torch.exp", "mindspore.mint.exp", 0, 1),
+    ]
+    assert [hit["pytorch"] for hit in result["diff_hits"]] == ["torch.addmm", "-"]
+
+
+def test_diagnose_translation_unknown_sections_share_base_tables(mapping_tables):
+    results = [tools.diagnose_translation(ORIGINAL, TRANSLATED, section=f"nosuch{i}") for i in range(5)]
+    assert all(r == results[0] for r in results)
+    assert [row["pytorch"] for row in results[0]["applied_mappings"]] == ["torch.abs", "torch.add"]
+    assert tools._mapping_lookup.cache_info().currsize == 1
+
+
+def test_diagnose_translation_no_hits(mapping_tables):
+    code = "print('torch')\n"
+    assert tools.diagnose_translation(code, "") == {
+        "applied_mappings": [],
+        "missing_mappings": [],
+        "diff_hits": [],
+        "extra_calls": [],
+        "annotated": code,
+    }
+
+
+def _registry() -> dict:
+    def model(mid, name, group, category, suite, task, **extra):
+        return {"id": mid, "name": name, "group": group, "category": category, "suite": suite, "task": task, **extra}
+
+    return {
+        "version": "test-1",
+        "models": [
+            model("resnet50", "ResNet50", "Vision", "Image Classification", "mindcv", ["image-classification"], notes="full"),
+            model("yolov8", "YOLOv8", "Vision", "Object Detection", "MindYOLO", ["object-detection"]),
+            model("dbnet", "DBNet", "Vision", "OCR/Text Detection", "mindocr", ["text-detection", "Object-Detection"]),
+            model("llama2", "Llama2", "LLM", "LLM", "mindformers", ["text-generation"]),
+            # name collides with the id of resnet50
+            model("resnet-v1", "resnet50", "Vision", "Image Classification", "mindcv", ["image-classification"]),
+            model("vit-b", "ViT", "Vision", "Image Classification", "mindcv", ["image-classification"]),
+            # id collides with the (earlier) name of vit-b
+            model("vit", "ViT-Tiny", "Vision", "Image Classification", "mindcv", ["image-classification"]),
+        ],
+    }
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(tools, "get_official_models", _registry)
+    tools._load_registry.cache_clear()
+    tools._list_models_cached.cache_clear()
+    yield
+    tools._load_registry.cache_clear()
+    tools._list_models_cached.cache_clear()
+
+
+def _ids(models: list[dict]) -> list[str]:
+    return [m["id"] for m in models]
+
+
+def test_list_models_exact_filters(registry):
+    assert len(tools.list_models()) == 7
+    assert _ids(tools.list_models(group="vision", task="OBJECT-DETECTION")) == ["yolov8", "dbnet"]
+    assert _ids(
+        tools.list_models(group="VISION", category="object detection", suite="mindyolo", task="Object-Detection")
+    ) == ["yolov8"]
+    assert _ids(tools.list_models(category="image classification", suite="MINDCV")) == ["resnet50", "resnet-v1", "vit-b", "vit"]
+    assert tools.list_models(group="vision", suite="mindformers") == []
+    assert tools.list_models(group="nope") == []
+
+
+def test_list_models_query(registry):
+    # q matches id or name substrings, case-insensitively, in registry order
+    assert _ids(tools.list_models(q="RESNET")) == ["resnet50", "resnet-v1"]
+    assert _ids(tools.list_models(q="vit")) == ["vit-b", "vit"]
+    assert _ids(tools.list_models(q="net", group="Vision")) == ["resnet50", "dbnet", "resnet-v1"]
+    assert _ids(tools.list_models(q="net", task="object-detection")) == ["dbnet"]
+    assert tools.list_models(q="net", group="llm") == []
+
+
+def test_list_models_projection(registry):
+    first = tools.list_models(q="resnet50")[0]
+    assert "notes" not in first
+    assert first["suite"] == "mindcv"
+    # each call returns a fresh list
+    tools.list_models().clear()
+    assert len(tools.list_models()) == 7
+
+
+def test_get_model_info_earliest_match_wins(registry):
+    # "resnet50" is the id of models[0] and the name of models[4]
+    assert tools.get_model_info("RESNET50")["id"] == "resnet50"
+    assert tools.get_model_info("RESNET50")["notes"] == "full"
+    # "vit" is the name of models[5] and the id of models[6]
+    assert tools.get_model_info("ViT")["id"] == "vit-b"
+    assert tools.get_model_info("vit-tiny")["id"] == "vit"
+    with pytest.raises(ValueError, match="version=test-1"):
+        tools.get_model_info("missing")
@@ -0,0 +1,57 @@
+from dataclasses import asdict
+from pathlib import Path
+
+from scripts.update_model_list import parse_models
+
+FIXTURE = Path(__file__).parent / "fixtures" / "official_models.html"
+
+
+def _rows(content: bytes, encoding: str = "utf-8"):
+    return [asdict(m) for m in parse_models(content, encoding)]
+
+
+def test_parse_models_fixture():
+    rows = _rows(FIXTURE.read_bytes())
+    by_id = {r["id"]: r for r in rows}
+
+    # output follows SECTION_PARSERS order, not page order; stray sub-section ids
+    # outside ocr/目标检测 are ignored
+    assert [r["id"] for r in rows] == [
+        "llama2", "glm2", "dbnet", "psenet", "crnn", "yolov8", "dbnet++", "wide&deep", "fno2d",
+    ]
+
+    assert by_id["llama2"]["variants"] == ["llama2_7b", "llama2_13b", "llama2_70b"]
+    assert by_id["llama2"]["links"] == {"card": "https://c/llama2", "config": None}
+    assert by_id["glm2"]["name"] == "glm2"
+
+    dbnet = by_id["dbnet"]
+    assert dbnet["category"] == "OCR/文本检测"
+    assert dbnet["task"] == ["text-detection"]
+    assert dbnet["metrics"] == {"fscore": 82.6}
+    assert dbnet["dataset"] == "ICDAR2015"
+    assert dbnet["links"] == {"card": "https://c/dbnet", "config": "https://g/mindocr/db.yaml"}
+    assert by_id["psenet"]["metrics"] is None
+    assert by_id["psenet"]["dataset"] is None
+    assert by_id["crnn"]["category"] == "OCR/文本识别"
+    assert by_id["crnn"]["metrics"] is None
+
+    assert by_id["yolov8"]["category"] == "目标检测/YOLO系列"
+    assert by_id["yolov8"]["metrics"] == {"map": 44.2}
+    assert by_id["yolov8"]["suite"] == "mindcv"
+    assert by_id["dbnet++"]["metrics"] == {"map": 0.1}
+    assert by_id["dbnet++"]["suite"] == "mindocr"
+
+    assert by_id["wide&deep"]["links"] == {"mindrec": "https://g/mindrec/wd", "mindspore": "https://g/ms/wd"}
+    assert by_id["wide&deep"]["metrics"] == {"auc": 0.8}
+
+    # the nested 科学计算说明 sub-section must not drop its parent's table
+    fno = by_id["fno2d"]
+    assert fno["group"] == "科学计算套件"
+    assert fno["category"] == "流体"
+    assert fno["hardware"] == {"ascend": True, "gpu": None}
+
+
+def test_parse_models_uses_given_encoding():
+    html = FIXTURE.read_bytes().decode("utf-8")
+    expected = _rows(html.encode("utf-8"))
+    assert _rows(html.encode("gb18030"), "gb18030") == expected